@@ -1,5 +1,7 @@
 # analytics.py
 import matplotlib.pyplot as plt  # Библиотека для построения графиков
+from forecast import Forecast  # Прогноз баланса методом Монте-Карло
+from currency import DEFAULT_CURRENCY, converted_amounts  # Пересчёт сумм в валюту отчёта
 
 # Базовые характеристики данных
 def analyze_data(data):
@@ -10,9 +12,18 @@ def analyze_data(data):
 
 # Основной класс для анализа финансовых данных
 class Analytics:
-    def __init__(self, df):
+    def __init__(self, df, rates=None):
         # Копируем данные, чтобы обезопасить исходный DataFrame
         self.df = df.copy()
+        # Таблица курсов и кэш пересчитанных сумм
+        self.rates = rates
+        self._converted = {}
+
+    def get_amounts(self, currency=None):
+        """
+        Возвращает суммы в валюте отчёта (без валюты — как есть).
+        """
+        return converted_amounts(self.df, self.rates, currency, self._converted)
 
     def filter_by_category(self, category):
         """
@@ -21,42 +32,48 @@ class Analytics:
         filtered_df = self.df[self.df['Category'].str.lower() == category.lower()]
         return filtered_df
 
-    def analyze_categories(self):
+    def analyze_categories(self, currency=None):
         """
         Суммирует расходы по каждой категории.
         """
-        expenses = self.df.query("Transaction_Type == 'Expense'")
-        result = expenses.groupby("Category")["Amount"].sum()
+        amounts = self.get_amounts(currency)
+        is_expense = self.df["Transaction_Type"] == "Expense"
+        result = amounts[is_expense].groupby(self.df.loc[is_expense, "Category"]).sum()
         return result
 
-    def analyze_period(self, start_date, end_date):
+    def analyze_period(self, start_date, end_date, currency=None):
         """
         Анализирует доходы и расходы за указанный период.
         """
-        period_df = self.df[(self.df["Date"] >= start_date) & (self.df["Date"] <= end_date)]
-        income = period_df.query("Transaction_Type == 'Income'")["Amount"].sum()
-        expenses = period_df.query("Transaction_Type == 'Expense'")["Amount"].sum()
+        amounts = self.get_amounts(currency)
+        in_period = (self.df["Date"] >= start_date) & (self.df["Date"] <= end_date)
+        income = amounts[in_period & (self.df["Transaction_Type"] == "Income")].sum()
+        expenses = amounts[in_period & (self.df["Transaction_Type"] == "Expense")].sum()
         return income, expenses
 
-    def get_top_expenses(self, n=5):
+    def get_top_expenses(self, n=5, currency=None):
         """
-        Возвращает список самых крупных расходов.
+        Возвращает список самых крупных расходов (суммы в валюте отчёта).
         """
-        expenses = self.df.query("Transaction_Type == 'Expense'")
+        converted = self.df.assign(Amount=self.get_amounts(currency), Currency=(currency or DEFAULT_CURRENCY).upper())
+        expenses = converted.query("Transaction_Type == 'Expense'")
         sorted_expenses = expenses.nlargest(n, "Amount")
         return sorted_expenses
 
 # Класс для визуализации данных
 class Visualization:
-    def __init__(self, df):
+    def __init__(self, df, rates=None):
         # Создаем экземпляр класса аналитики
-        self.analytics = Analytics(df)
+        self.analytics = Analytics(df, rates)
+        # Прогноз баланса по тем же данным
+        self.forecast = Forecast(df, rates)
 
     def plot_income_vs_expenses_over_time(self):
         """
         Линейный график доходов и расходов за первые три дня.
         """
-        grouped = self.analytics.df.groupby(['Date', 'Transaction_Type'])['Amount'].sum().unstack(fill_value=0)
+        df = self.analytics.df.assign(Amount=self.analytics.get_amounts())
+        grouped = df.groupby(['Date', 'Transaction_Type'])['Amount'].sum().unstack(fill_value=0)
         unique_dates = sorted(grouped.index.unique())[:3]
         first_three_days_grouped = grouped.loc[unique_dates]
         first_three_days_grouped.plot(kind="line", title="Доходы и расходы за первые три дня")
@@ -86,4 +103,21 @@ class Visualization:
         plt.ylabel("Сумма")
         plt.title(f"Топ {n} крупные расходы")
         plt.xticks(rotation=45)
+        plt.show()
+
+    def plot_forecast(self, horizon_months=12, forecast=None):
+        """
+        Прогноз баланса с перцентильными коридорами.
+        forecast — прогноз по актуальным данным (по умолчанию — по данным при создании).
+        """
+        bands = (forecast or self.forecast).monte_carlo(horizon_months)
+        dates = bands.index.to_timestamp()
+        plt.figure(figsize=(10, 6))
+        plt.fill_between(dates, bands["P5"], bands["P95"], alpha=0.2, label="5–95%")
+        plt.fill_between(dates, bands["P25"], bands["P75"], alpha=0.4, label="25–75%")
+        plt.plot(dates, bands["P50"], label="Медиана")
+        plt.xlabel("Месяц")
+        plt.ylabel("Баланс")
+        plt.title(f"Прогноз баланса на {horizon_months} мес.")
+        plt.legend()
         plt.show()
\ No newline at end of file
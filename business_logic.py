@@ -1,5 +1,7 @@
 #business_logic.py
 from analytics import Analytics, Visualization
+from forecast import Forecast
+from currency import DEFAULT_CURRENCY
 
 # Бизнес-логика приложения
 class BusinessLogic:
@@ -7,19 +9,17 @@ class BusinessLogic:
         # Модель данных
         self.model = model
 
-    def calculate_balance(self):
+    def calculate_balance(self, currency=None):
         """
         Подсчитывает текущий баланс.
         """
-        income = self.model.data.query("Transaction_Type == 'Income'").Amount.sum()
-        expenses = self.model.data.query("Transaction_Type == 'Expense'").Amount.sum()
-        return income - expenses
+        return self.model.calculate_balance(currency)
 
-    def add_transaction(self, amount, type_, date, category, comment=''):
+    def add_transaction(self, amount, type_, date, category, comment='', currency=DEFAULT_CURRENCY):
         """
         Добавляет новую транзакцию.
         """
-        self.model.add_transaction(amount, type_, date, category, comment)
+        self.model.add_transaction(amount, type_, date, category, comment, currency)
         self.model.save_changes()
 
     def delete_transaction(self, index):
@@ -35,15 +35,15 @@ class TransactionManager:
         # Контроллер для взаимодействия с моделью
         self.controller = controller
         # Аналитика для отчетности
-        self.analytics = Analytics(controller.model.data)
+        self.analytics = Analytics(controller.model.get_data(), controller.model.rates)
         # Визуализация для графики
-        self.visualization = Visualization(controller.model.data)
+        self.visualization = Visualization(controller.model.get_data(), controller.model.rates)
 
-    def add_transaction(self, amount, transaction_type, date, category, comment=""):
+    def add_transaction(self, amount, transaction_type, date, category, comment="", currency=DEFAULT_CURRENCY):
         """
         Добавляет новую финансовую операцию.
         """
-        self.controller.add_transaction(amount, transaction_type, date, category, comment)
+        self.controller.add_transaction(amount, transaction_type, date, category, comment, currency)
 
     def delete_transaction(self, index):
         """
@@ -61,25 +61,37 @@ class TransactionManager:
         """
         Возвращает все доступные транзакции.
         """
-        return self.controller.model.data.copy()
+        return self.controller.model.get_data()
 
-    def calculate_balance(self):
+    def calculate_balance(self, currency=None):
         """
         Вычисляет баланс счетов.
         """
-        return self.controller.calculate_balance()
+        return self.controller.calculate_balance(currency)
 
-    def analyze_categories(self):
+    def get_currencies(self):
+        """
+        Список валют, для которых загружены курсы.
+        """
+        return self.controller.model.rates.currencies()
+
+    def get_rates(self):
+        """
+        Таблица курсов валют.
+        """
+        return self.controller.model.rates
+
+    def analyze_categories(self, currency=None):
         """
         Отчеты по расходам по категориям.
         """
-        return self.analytics.analyze_categories()
+        return self.analytics.analyze_categories(currency)
 
-    def analyze_period(self, start_date, end_date):
+    def analyze_period(self, start_date, end_date, currency=None):
         """
         Анализ бюджета за указанный период.
         """
-        return self.analytics.analyze_period(start_date, end_date)
+        return self.analytics.analyze_period(start_date, end_date, currency)
 
     def get_top_expenses(self, n=5):
         """
@@ -103,4 +115,28 @@ class TransactionManager:
         """
         Гистограмма топовых расходов.
         """
-        self.visualization.plot_bar_chart_top_expenses(n)
\ No newline at end of file
+        self.visualization.plot_bar_chart_top_expenses(n)
+
+    def get_forecast(self):
+        """
+        Прогноз по текущим данным модели, включая операции, добавленные за сеанс.
+        """
+        return Forecast(self.controller.model.get_data(), self.controller.model.rates)
+
+    def detect_recurring(self):
+        """
+        Регулярные доходы и расходы.
+        """
+        return self.get_forecast().detect_recurring()
+
+    def forecast_balance(self, horizon_months=12):
+        """
+        Перцентили прогнозного баланса по месяцам.
+        """
+        return self.get_forecast().monte_carlo(horizon_months)
+
+    def plot_forecast(self, horizon_months=12):
+        """
+        График прогноза баланса.
+        """
+        self.visualization.plot_forecast(horizon_months, self.get_forecast())
\ No newline at end of file
@@ -3,8 +3,8 @@ from model import FinancialModel  # Подключение модуля с фи
 
 # Контроллер финансов - управляет основными действиями над финансовыми данными
 class FinancialController:
-    def __init__(self, csv_file):  # Конструктор принимает путь к файлу CSV
-        self.model = FinancialModel(csv_file)  # Инициализируем финансовый модуль с указанным файлом
+    def __init__(self, csv_file=None, fx_file=None):  # Конструктор принимает путь к файлу CSV (None — хранение в памяти) и файлу курсов валют
+        self.model = FinancialModel(csv_file, fx_file)  # Инициализируем финансовый модуль с указанными файлами
 
     # Метод добавления новой финансовой операции
     def add_transaction(self, *args):
@@ -26,5 +26,5 @@ class FinancialController:
         return self.model.filter_by_date(start_date, end_date)  # Возвращаем транзакции за выбранный диапазон дат
 
     # Метод вычисления текущего финансового баланса
-    def calculate_balance(self):
-        return self.model.calculate_balance()  # Возврат общего баланса (разницы между доходами и расходами)
\ No newline at end of file
+    def calculate_balance(self, currency=None):
+        return self.model.calculate_balance(currency)  # Возврат общего баланса (разницы между доходами и расходами)
\ No newline at end of file
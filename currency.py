@@ -0,0 +1,143 @@
+# currency.py
+import itertools
+import numpy as np
+import pandas as pd
+
+# Базовая валюта: курсы в таблице задаются в рублях за единицу валюты
+DEFAULT_CURRENCY = "RUB"
+
+# Счётчик версий таблиц курсов
+_versions = itertools.count(1)
+
+
+# Таблица курсов валют по датам
+class FXRates:
+    def __init__(self, csv_file=None):
+        """
+        Инициализирует таблицу курсов.
+        :param csv_file: Путь к файлу .csv со столбцами Date, Currency, Rate.
+        """
+        self.csv_file = csv_file
+        self.rates = {}
+        self.version = next(_versions)
+        if csv_file is not None:
+            self.load_data()
+
+    def load_data(self):
+        """
+        Загружает курсы из файла .csv.
+        Если файл не существует, таблица остаётся пустой.
+        """
+        try:
+            table = pd.read_csv(self.csv_file)
+        except FileNotFoundError:
+            table = pd.DataFrame(columns=["Date", "Currency", "Rate"])
+        self.set_rates(table)
+
+    def set_rates(self, table):
+        """
+        Заменяет курсы и присваивает таблице новую версию.
+        Для каждой валюты хранятся отсортированные даты и курсы.
+        """
+        table = pd.DataFrame({
+            "Date": pd.to_datetime(table["Date"], format="%Y-%m-%d").to_numpy().astype("datetime64[D]"),
+            "Currency": table["Currency"].astype(str).str.upper(),
+            "Rate": pd.to_numeric(table["Rate"]).astype(float),
+        }).sort_values(["Currency", "Date"])
+        self.rates = {
+            currency: (group["Date"].to_numpy(), group["Rate"].to_numpy())
+            for currency, group in table.groupby("Currency")
+        }
+        self.version = next(_versions)
+
+    def currencies(self):
+        """
+        Возвращает список доступных валют.
+        """
+        return sorted({DEFAULT_CURRENCY, *self.rates})
+
+    def first_date(self, currency):
+        """
+        Возвращает дату первого известного курса валюты (для базовой валюты — None).
+        """
+        if currency == DEFAULT_CURRENCY or currency not in self.rates:
+            return None
+        return pd.Timestamp(self.rates[currency][0][0]).date()
+
+    def rate_asof(self, currency, dates):
+        """
+        Возвращает курс валюты на каждую дату (последний известный курс на эту дату).
+        """
+        if currency == DEFAULT_CURRENCY:
+            return np.ones(len(dates))
+        if currency not in self.rates:
+            raise ValueError(f"Нет курсов для валюты {currency}")
+        rate_dates, rates = self.rates[currency]
+        positions = np.searchsorted(rate_dates, dates, side="right") - 1
+        if len(dates) and ((positions < 0) | np.isnat(dates)).any():
+            raise ValueError(f"Нет курса {currency} на дату операции")
+        return rates[positions]
+
+    def convert(self, amounts, currencies, dates, target=DEFAULT_CURRENCY):
+        """
+        Пересчитывает суммы в целевую валюту по курсу на дату операции.
+        Курсы подбираются сразу для всех строк одной валюты.
+        """
+        amounts = pd.to_numeric(pd.Series(amounts), errors="coerce").to_numpy(dtype=float)
+
+        # Коды валют нормализуются только для уникальных значений
+        codes, uniques = pd.factorize(pd.Series(currencies), use_na_sentinel=False)
+        names = pd.Series(uniques).fillna(DEFAULT_CURRENCY).astype(str).str.upper().to_numpy()
+
+        result = np.empty(len(amounts))
+        row_dates = None
+        for currency in set(names):
+            mask = np.isin(codes, np.flatnonzero(names == currency))
+            if currency == target:
+                result[mask] = amounts[mask]
+                continue
+            if row_dates is None:
+                row_dates = _parse_dates(dates)
+            masked_dates = row_dates[mask]
+            result[mask] = amounts[mask] * self.rate_asof(currency, masked_dates) / self.rate_asof(target, masked_dates)
+        return result
+
+    def convert_one(self, amount, currency, date, target=DEFAULT_CURRENCY):
+        """
+        Пересчитывает одну сумму без разбора столбцов (для добавляемой транзакции).
+        """
+        amount = float(amount)
+        currency = (currency or DEFAULT_CURRENCY).upper()
+        if currency == target:
+            return amount
+        day = np.array([np.datetime64(date, "D")])
+        return float(amount * self.rate_asof(currency, day)[0] / self.rate_asof(target, day)[0])
+
+
+# Пустая таблица курсов для данных только в базовой валюте
+_NO_RATES = FXRates()
+
+
+def _parse_dates(dates):
+    """
+    Разбирает даты формата YYYY-MM-DD, обрабатывая каждое значение один раз.
+    """
+    codes, uniques = pd.factorize(pd.Series(dates), use_na_sentinel=False)
+    parsed = pd.to_datetime(pd.Series(uniques), format="%Y-%m-%d", errors="coerce")
+    return parsed.to_numpy().astype("datetime64[D]")[codes]
+
+
+def converted_amounts(df, rates, currency, cache):
+    """
+    Возвращает столбец сумм в валюте отчёта (по умолчанию — в базовой валюте).
+    Результат кэшируется по ключу (валюта отчёта, версия таблицы курсов).
+    """
+    currency = currency or DEFAULT_CURRENCY
+    if rates is None:
+        rates = _NO_RATES
+    key = (currency.upper(), rates.version)
+    if key not in cache:
+        currencies = df["Currency"] if "Currency" in df else pd.Series(DEFAULT_CURRENCY, index=df.index)
+        values = rates.convert(df["Amount"], currencies, df["Date"], currency.upper())
+        cache[key] = pd.Series(values, index=df.index, name="Amount")
+    return cache[key]
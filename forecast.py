@@ -0,0 +1,188 @@
+# forecast.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from currency import DEFAULT_CURRENCY, converted_amounts  # Пересчёт сумм в базовую валюту
+
+# Параметры прогноза
+MAX_HORIZON_MONTHS = 60           # Максимальный горизонт прогноза — 5 лет
+DAYS_PER_MONTH = 365.25 / 12      # Средняя длина месяца в днях
+CHUNK_PATHS = 5000                # Количество траекторий в одном пакете
+PARALLEL_MIN_PATHS = 200_000      # Меньше траекторий не окупают запуск процессов
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def prepare_ledger(df, amounts=None):
+    """
+    Приводит журнал транзакций к числовому виду: даты, суммы и знак операции.
+    amounts — суммы в одной валюте (по умолчанию столбец Amount как есть).
+    Строки с некорректной датой или суммой отбрасываются.
+    """
+    if amounts is None:
+        amounts = df["Amount"]
+    ledger = pd.DataFrame({
+        "Date": pd.to_datetime(df["Date"], format="%Y-%m-%d", errors="coerce"),
+        "Amount": pd.to_numeric(amounts, errors="coerce"),
+        "Transaction_Type": df["Transaction_Type"],
+        "Category": df["Category"],
+    })
+    ledger = ledger.dropna(subset=["Date", "Amount"])
+    ledger = ledger[ledger["Transaction_Type"].isin(["Income", "Expense"])].copy()
+    ledger["Signed"] = np.where(ledger["Transaction_Type"] == "Income", ledger["Amount"], -ledger["Amount"])
+    return ledger
+
+
+def detect_recurring(df, amounts=None, min_occurrences=3, interval_tolerance=0.25, amount_tolerance=0.2):
+    """
+    Находит регулярные доходы и расходы (зарплата, аренда и т.п.).
+    Операции группируются по типу и категории; группа считается регулярной,
+    если интервалы между датами и суммы почти не меняются.
+    """
+    return _recurring_from_ledger(prepare_ledger(df, amounts), min_occurrences, interval_tolerance, amount_tolerance)
+
+
+def _recurring_from_ledger(ledger, min_occurrences=3, interval_tolerance=0.25, amount_tolerance=0.2):
+    """
+    Находит регулярные операции в журнале, уже подготовленном prepare_ledger.
+    """
+    ledger = ledger.sort_values(["Transaction_Type", "Category", "Date"])
+    columns = ["Transaction_Type", "Category", "Occurrences", "Period_Days",
+               "Mean_Amount", "Std_Amount", "Last_Date", "Monthly_Amount"]
+    if ledger.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Интервалы между соседними операциями внутри одной группы
+    codes = ledger.groupby(["Transaction_Type", "Category"], sort=False).ngroup().to_numpy()
+    days = ledger["Date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    same_group = codes[1:] == codes[:-1]
+    intervals = pd.DataFrame({"Code": codes[1:][same_group], "Interval": np.diff(days)[same_group]})
+    interval_stats = intervals.groupby("Code")["Interval"].agg(["mean", "std"])
+
+    grouped = ledger.assign(Code=codes).groupby("Code")
+    stats = grouped.agg(
+        Transaction_Type=("Transaction_Type", "first"),
+        Category=("Category", "first"),
+        Occurrences=("Amount", "size"),
+        Mean_Amount=("Amount", "mean"),
+        Std_Amount=("Amount", "std"),
+        Last_Date=("Date", "max"),
+    ).join(interval_stats, how="inner")
+    stats["Std_Amount"] = stats["Std_Amount"].fillna(0.0)
+    stats["std"] = stats["std"].fillna(0.0)
+
+    # Регулярность: достаточно повторов, стабильный интервал и сумма,
+    # и группа не прекратилась задолго до конца журнала
+    last_date = ledger["Date"].max()
+    idle_days = (last_date - stats["Last_Date"]).dt.days
+    mask = (
+        (stats["Occurrences"] >= min_occurrences)
+        & (stats["mean"] > 0)
+        & (stats["std"] <= interval_tolerance * stats["mean"])
+        & (stats["Std_Amount"] <= amount_tolerance * stats["Mean_Amount"].abs())
+        & (idle_days <= 2 * stats["mean"])
+    )
+    recurring = stats[mask].rename(columns={"mean": "Period_Days"})
+    recurring["Monthly_Amount"] = recurring["Mean_Amount"] * DAYS_PER_MONTH / recurring["Period_Days"]
+    return recurring[columns].reset_index(drop=True)
+
+
+def _simulate_chunk(start_balance, mean, std, horizon_months, n_paths, seed):
+    """
+    Моделирует пакет траекторий баланса одной матричной операцией.
+    """
+    rng = np.random.default_rng(seed)
+    flows = rng.normal(mean, std, size=(n_paths, horizon_months))
+    return start_balance + np.cumsum(flows, axis=1)
+
+
+# Прогноз движения денежных средств методом Монте-Карло
+class Forecast:
+    def __init__(self, df, rates=None):
+        # Копируем данные, чтобы обезопасить исходный DataFrame
+        self.df = df.copy()
+        # Прогноз строится в базовой валюте по таблице курсов
+        self.rates = rates
+        self._converted = {}
+
+    def get_amounts(self):
+        """
+        Возвращает суммы в базовой валюте.
+        """
+        return converted_amounts(self.df, self.rates, DEFAULT_CURRENCY, self._converted)
+
+    def get_ledger(self):
+        """
+        Возвращает журнал, подготовленный для прогноза (суммы в базовой валюте).
+        """
+        return prepare_ledger(self.df, self.get_amounts())
+
+    def detect_recurring(self, **kwargs):
+        """
+        Возвращает таблицу регулярных операций.
+        """
+        return _recurring_from_ledger(self.get_ledger(), **kwargs)
+
+    def monthly_flow_parameters(self, ledger=None):
+        """
+        Оценивает среднее и разброс месячного денежного потока:
+        регулярные операции плюс остаток нерегулярных трат и поступлений.
+        ledger — уже подготовленный журнал, чтобы не готовить его повторно.
+        """
+        if ledger is None:
+            ledger = self.get_ledger()
+        if ledger.empty:
+            return 0.0, 0.0
+
+        recurring = _recurring_from_ledger(ledger)
+        sign = np.where(recurring["Transaction_Type"] == "Income", 1.0, -1.0)
+        per_month = DAYS_PER_MONTH / recurring["Period_Days"].to_numpy(dtype=float)
+        recurring_mean = float(np.sum(sign * recurring["Monthly_Amount"].to_numpy(dtype=float)))
+        recurring_var = float(np.sum(recurring["Std_Amount"].to_numpy(dtype=float) ** 2 * per_month))
+
+        # Нерегулярные операции агрегируются по месяцам, пустые месяцы — нули
+        keys = pd.MultiIndex.from_frame(recurring[["Transaction_Type", "Category"]])
+        is_recurring = pd.MultiIndex.from_frame(ledger[["Transaction_Type", "Category"]]).isin(keys)
+        months = ledger["Date"].dt.to_period("M")
+        all_months = pd.period_range(months.min(), months.max(), freq="M")
+        residual = ledger.loc[~is_recurring, "Signed"].groupby(months[~is_recurring]).sum()
+        residual = residual.reindex(all_months, fill_value=0.0)
+        residual_mean = float(residual.mean())
+        residual_var = float(residual.var()) if len(residual) > 1 else 0.0
+
+        return recurring_mean + residual_mean, float(np.sqrt(recurring_var + residual_var))
+
+    def monte_carlo(self, horizon_months=12, n_paths=10000, percentiles=DEFAULT_PERCENTILES, seed=None, n_jobs=1):
+        """
+        Строит прогноз баланса на horizon_months месяцев вперёд.
+        Возвращает DataFrame с перцентилями баланса по месяцам.
+        По умолчанию расчёт идёт в текущем процессе; n_jobs > 1 (None — все ядра)
+        включает пул процессов, если траекторий не меньше PARALLEL_MIN_PATHS.
+        """
+        if not 1 <= horizon_months <= MAX_HORIZON_MONTHS:
+            raise ValueError(f"Горизонт прогноза должен быть от 1 до {MAX_HORIZON_MONTHS} месяцев")
+
+        ledger = self.get_ledger()
+        start_balance = float(ledger["Signed"].sum())
+        mean, std = self.monthly_flow_parameters(ledger)
+
+        # Пакеты фиксированного размера с независимыми потоками случайных чисел,
+        # поэтому результат не зависит от числа процессов
+        sizes = [CHUNK_PATHS] * (n_paths // CHUNK_PATHS)
+        if n_paths % CHUNK_PATHS:
+            sizes.append(n_paths % CHUNK_PATHS)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        args = [(start_balance, mean, std, horizon_months, size, s) for size, s in zip(sizes, seeds)]
+
+        workers = min(n_jobs or os.cpu_count() or 1, len(args))
+        if workers > 1 and n_paths >= PARALLEL_MIN_PATHS:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = list(executor.map(_simulate_chunk, *zip(*args)))
+        else:
+            chunks = [_simulate_chunk(*a) for a in args]
+        paths = np.vstack(chunks)
+
+        start = ledger["Date"].max() if not ledger.empty else pd.Timestamp.today()
+        index = pd.period_range(start.to_period("M") + 1, periods=horizon_months, freq="M")
+        bands = np.percentile(paths, percentiles, axis=0)
+        return pd.DataFrame(bands.T, index=index, columns=[f"P{p}" for p in percentiles])
@@ -5,8 +5,8 @@ from business_logic import TransactionManager  # Управление транз
 
 # Точка входа в приложение
 if __name__ == "__main__":
-    # Создаем контроллер, подключенный к файлу с транзакциями
-    controller = FinancialController("data/transactions.csv")
+    # Создаем контроллер, подключенный к файлу с транзакциями и файлу курсов валют
+    controller = FinancialController("data/transactions.csv", "data/fx_rates.csv")
 
     # Инициализируем менеджер транзакций, который управляется контроллером
     logic_manager = TransactionManager(controller)
@@ -2,82 +2,194 @@
 import pandas as pd
 import os
 from validation import clean_category, clean_comment  # Модули для очистки данных
+from currency import DEFAULT_CURRENCY, FXRates, converted_amounts  # Курсы и пересчёт валют
+
+COLUMNS = ["Amount", "Transaction_Type", "Date", "Category", "Comment", "Currency"]
 
 class FinancialModel:
-    def __init__(self, csv_file):
+    def __init__(self, csv_file=None, fx_file=None):
         """
         Инициализирует модель данных.
-        :param csv_file: Путь к файлу .csv.
+        :param csv_file: Путь к файлу .csv. Если не указан, данные хранятся только в памяти.
+        :param fx_file: Путь к файлу .csv с курсами валют.
         """
         self.csv_file = csv_file
+        self.rates = FXRates(fx_file)
         self.load_data()
 
+    def set_data(self, frame):
+        """
+        Заменяет таблицу транзакций и сбрасывает накопленные изменения и кэш пересчитанных сумм.
+        Добавления и удаления накапливаются и применяются при flush(),
+        поэтому таблицу читают только через get_data().
+        """
+        self._data = frame
+        self._pending = []
+        self._deleted = set()
+        self._converted = {}
+        self._unsaved = []
+        self._rewrite = True
+
+    def flush(self):
+        """
+        Применяет накопленные добавления и удаления к таблице одним действием.
+        """
+        if self._deleted:
+            deleted = list(self._deleted)
+            self._data = self._data.drop(deleted)
+            for entry in self._converted.values():
+                entry["amounts"] = entry["amounts"].drop(deleted)
+            self._deleted = set()
+        if self._pending:
+            new_rows = pd.DataFrame(self._pending, columns=COLUMNS)
+            frames = [frame for frame in (self._data, new_rows) if not frame.empty]
+            self._data = pd.concat(frames, ignore_index=True) if frames else new_rows
+            for entry in self._converted.values():
+                added = pd.Series(entry["added"], dtype=float)
+                entry["amounts"] = pd.concat([entry["amounts"], added], ignore_index=True)
+                entry["added"] = []
+            self._pending = []
+
     def load_data(self):
         """
         Загружает данные из файла .csv.
-        Если файл не существует, создаётся пустой DataFrame.
+        Если файл не существует или не задан, создаётся пустой DataFrame.
         """
+        if self.csv_file is None:
+            self.set_data(pd.DataFrame(columns=COLUMNS))
+            return
+
         directory = os.path.dirname(self.csv_file)
         if directory and not os.path.exists(directory):
             os.makedirs(directory)
 
         try:
-            self.data = pd.read_csv(self.csv_file)
+            data = pd.read_csv(self.csv_file)
         except FileNotFoundError:
-            columns = ["Amount", "Transaction_Type", "Date", "Category", "Comment"]
-            self.data = pd.DataFrame(columns=columns)
+            data = pd.DataFrame(columns=COLUMNS)
+
+        # Старые файлы без валюты считаются записанными в базовой валюте
+        has_currency = "Currency" in data
+        if not has_currency:
+            data["Currency"] = DEFAULT_CURRENCY
+        data["Currency"] = data["Currency"].fillna(DEFAULT_CURRENCY)
+        self.set_data(data)
+
+        # Файл без столбца валюты (или ещё не созданный) при сохранении записывается целиком
+        self._rewrite = not has_currency or not os.path.exists(self.csv_file)
 
     def get_data(self):
         """
         Возвращает копию данных.
         """
-        return self.data.copy()
+        self.flush()
+        return self._data.copy()
 
     def save_data(self):
         """
-        Сохраняет данные в файл .csv.
-        """
-        self.data.to_csv(self.csv_file, index=False)
+        Сохраняет данные в файл .csv (в режиме хранения в памяти ничего не делает).
+        Если с прошлого сохранения строки только добавлялись, они дописываются в конец файла.
+        """
+        if self.csv_file is None:
+            self._unsaved = []
+            return
+        if self._rewrite:
+            self.flush()
+            self._data.to_csv(self.csv_file, index=False)
+        elif self._unsaved:
+            new_rows = pd.DataFrame(self._unsaved, columns=COLUMNS).reindex(columns=self._data.columns)
+            new_rows.to_csv(self.csv_file, mode="a", header=False, index=False)
+        self._unsaved = []
+        self._rewrite = False
 
-    def add_transaction(self, amount, transaction_type, date, category, comment):
+    def add_transaction(self, amount, transaction_type, date, category, comment, currency=DEFAULT_CURRENCY):
         """
         Добавляет новую транзакцию.
-        """
-        new_row = pd.DataFrame({
-            "Amount": [amount],
-            "Transaction_Type": [transaction_type],
-            "Date": [date],
-            "Category": [category],
-            "Comment": [comment]
-        })
-        self.data = pd.concat([self.data, new_row], ignore_index=True)
+        Строка попадает в таблицу при вызове flush();
+        в кэше пересчитанных сумм пересчитывается только она.
+        """
+        row = [amount, transaction_type, date, category, comment, currency]
+        self._pending.append(row)
+        self._unsaved.append(row)
+        for key, entry in list(self._converted.items()):
+            try:
+                value = self.rates.convert_one(amount, currency, date, key[0])
+            except ValueError:
+                # Нет курса на дату: запись будет построена заново при следующем запросе
+                del self._converted[key]
+                continue
+            entry["added"].append(value)
+            if transaction_type in entry["totals"]:
+                entry["totals"][transaction_type] += value
 
     def delete_transaction(self, index):
         """
         Удаляет транзакцию по индексу.
+        Строка убирается из таблицы при вызове flush().
+        """
+        # Индексы новых строк известны только после их добавления в таблицу
+        if self._pending:
+            self.flush()
+        if index in self._deleted or index not in self._data.index:
+            raise KeyError(index)
+        transaction_type = self._data.at[index, "Transaction_Type"]
+        for entry in self._converted.values():
+            if transaction_type in entry["totals"]:
+                entry["totals"][transaction_type] -= entry["amounts"].at[index]
+        self._deleted.add(index)
+        self._rewrite = True
+
+    def _conversion(self, currency):
+        """
+        Возвращает запись кэша для валюты отчёта: пересчитанные суммы и итоги
+        доходов и расходов. Запись строится один раз для версии таблицы курсов,
+        дальше её поддерживают add_transaction и delete_transaction.
+        """
+        key = ((currency or DEFAULT_CURRENCY).upper(), self.rates.version)
+        if key not in self._converted:
+            self.flush()
+            amounts = converted_amounts(self._data, self.rates, key[0], {})
+            types = self._data["Transaction_Type"].to_numpy()
+            self._converted = {k: v for k, v in self._converted.items() if k[1] == self.rates.version}
+            self._converted[key] = {
+                "amounts": amounts,
+                "added": [],
+                "totals": {
+                    "Income": float(amounts[types == "Income"].sum()),
+                    "Expense": float(amounts[types == "Expense"].sum()),
+                },
+            }
+        return self._converted[key]
+
+    def get_amounts(self, currency=None):
+        """
+        Возвращает суммы транзакций в валюте отчёта (по умолчанию — в базовой валюте).
         """
-        self.data.drop(index, inplace=True)
+        entry = self._conversion(currency)
+        self.flush()
+        return entry["amounts"]
 
     def filter_by_category(self, category):
         """
         Фильтрует транзакции по категории.
         """
-        return self.data[self.data["Category"].str.lower() == category.lower()]
+        self.flush()
+        return self._data[self._data["Category"].str.lower() == category.lower()]
 
-    def calculate_balance(self):
+    def calculate_balance(self, currency=None):
         """
-        Вычисляет текущий баланс.
+        Вычисляет текущий баланс в валюте отчёта (по умолчанию — в базовой валюте).
         """
-        income = self.data.query("Transaction_Type == 'Income'")["Amount"].sum()
-        expenses = self.data.query("Transaction_Type == 'Expense'")["Amount"].sum()
-        return income - expenses
+        totals = self._conversion(currency)["totals"]
+        return totals["Income"] - totals["Expense"]
 
     def clean_data(self, data=None):
         """
         Очищает данные, удаляя специальные символы из категорий и комментариев.
         """
         if data is None:
-            data = self.data
+            self.flush()
+            data = self._data
         cleaned_data = data.copy()
         cleaned_data["Category"] = cleaned_data["Category"].apply(clean_category)
         cleaned_data["Comment"] = cleaned_data["Comment"].apply(clean_comment)
@@ -87,11 +199,10 @@ class FinancialModel:
         """
         Сбрасывает все данные, формируя пустую таблицу.
         """
-        columns = ["Amount", "Transaction_Type", "Date", "Category", "Comment"]
-        self.data = pd.DataFrame(columns=columns)
+        self.set_data(pd.DataFrame(columns=COLUMNS))
 
     def save_changes(self):
         """
         Сохраняет изменения в файл.
         """
-        self.data.to_csv(self.csv_file, index=False)
\ No newline at end of file
+        self.save_data()
\ No newline at end of file
@@ -1,30 +1,28 @@
 # test_suite.py
+import os
+import sys
+import time
 import unittest
+from unittest import mock
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
 from model import FinancialModel
-from business_logic import BusinessLogic
+from controller import FinancialController
+from business_logic import BusinessLogic, TransactionManager
 from validation import validate_transaction
+from forecast import Forecast, MAX_HORIZON_MONTHS
+from currency import FXRates
+from analytics import Analytics
 
 # Юнит-тесты
 class TestFinancialApp(unittest.TestCase):
     def setUp(self):
-        # Создаем временный файл для хранения данных в процессе тестирования
-        self.temp_file = tempfile.NamedTemporaryFile(suffix='.csv', mode='w+', encoding='utf-8', delete=False)
-        headers = ["Amount", "Type", "Date", "Category", "Comment"]
-        pd.DataFrame(columns=headers).to_csv(self.temp_file.name, index=False)
-        self.model = FinancialModel(self.temp_file.name)
+        # Модель хранит данные только в памяти — тесты не обращаются к диску
+        self.model = FinancialModel()
         self.logic = BusinessLogic(self.model)
 
-        # Очищаем данные перед каждым новым тестом
-        self.model.clean_data()
-
-    def tearDown(self):
-        # Закрываем и удаляем временный файл после окончания теста
-        self.temp_file.close()
-        import os
-        os.unlink(self.temp_file.name)
-
     def test_add_transaction(self):
         # Добавляем новую транзакцию
         self.logic.add_transaction(1000, 'Income', '2026-01-01', 'Зарплата', '')
@@ -48,6 +46,47 @@ class TestFinancialApp(unittest.TestCase):
         balance = self.logic.calculate_balance()
         self.assertEqual(balance, 500, "Баланс подсчитан некорректно!")
 
+    def test_calculate_balance_in_currency(self):
+        # Проверяем баланс в валюте отчёта
+        self.model.rates.set_rates(pd.DataFrame({"Date": ["2026-01-01"], "Currency": ["USD"], "Rate": [100.0]}))
+        self.logic.add_transaction(1000, 'Income', '2026-01-01', 'Зарплата', '')
+        self.logic.add_transaction(5, 'Expense', '2026-01-01', 'Расходы', '', 'USD')
+        self.assertEqual(self.logic.calculate_balance('RUB'), 500, "Баланс в рублях подсчитан некорректно!")
+        self.assertEqual(self.logic.calculate_balance('USD'), 5, "Баланс в долларах подсчитан некорректно!")
+        self.assertEqual(self.logic.calculate_balance(), 500, "Баланс по умолчанию должен быть в рублях!")
+
+    def test_incremental_conversion(self):
+        # Кэш пересчитанных сумм обновляется построчно и совпадает с полным пересчётом
+        self.model.rates.set_rates(pd.DataFrame({"Date": ["2026-01-01"], "Currency": ["USD"], "Rate": [100.0]}))
+        self.logic.add_transaction(1000, 'Income', '2026-01-01', 'Зарплата', '')
+        self.assertEqual(self.logic.calculate_balance('USD'), 10)
+        self.logic.add_transaction(2, 'Expense', '2026-01-02', 'Расходы', '', 'USD')
+        self.logic.add_transaction(300, 'Expense', '2026-01-03', 'Расходы', '')
+        self.logic.delete_transaction(0)
+        self.assertEqual(self.logic.calculate_balance('USD'), -5)
+        self.assertEqual(list(self.model.get_amounts('USD')), [2.0, 3.0])
+        self.assertEqual(list(self.model.get_amounts('USD').index), list(self.model.get_data().index))
+
+    def test_save_and_load(self):
+        # Проверяем сохранение во временный файл и повторную загрузку
+        with tempfile.TemporaryDirectory() as directory:
+            csv_file = os.path.join(directory, 'transactions.csv')
+            model = FinancialModel(csv_file)
+            BusinessLogic(model).add_transaction(1000, 'Income', '2026-01-01', 'Зарплата', '')
+            loaded = FinancialModel(csv_file)
+            self.assertEqual(list(loaded.get_data()['Category']), ['Зарплата'], "Данные не сохранены!")
+            self.assertEqual(loaded.calculate_balance(), 1000, "Баланс после загрузки некорректен!")
+
+            # Добавления дописываются в конец файла, удаление перезаписывает его целиком
+            controller = FinancialController(csv_file)
+            controller.add_transaction(300, 'Expense', '2026-01-02', 'Продукты', '')
+            controller.add_transaction(200, 'Expense', '2026-01-03', 'Разное', '')
+            self.assertEqual(list(FinancialModel(csv_file).get_data()['Category']), ['Зарплата', 'Продукты', 'Разное'])
+            controller.delete_transaction(1)
+            loaded = FinancialModel(csv_file)
+            self.assertEqual(list(loaded.get_data()['Category']), ['Зарплата', 'Разное'], "Удаление не сохранено!")
+            self.assertEqual(loaded.calculate_balance(), 800, "Баланс после загрузки некорректен!")
+
     def test_validation_errors(self):
         # Проверяем обнаружение ошибок валидации
         errors = validate_transaction('-1000', 'Invalid Type', 'bad-date', 'invalid-category', '')
@@ -58,19 +97,259 @@ class TestFinancialApp(unittest.TestCase):
         errors = validate_transaction('1000', 'Income', '2026-01-02', 'Зарплата', '')
         self.assertFalse(errors, "Корректная транзакция вызывает ошибку!")
 
+# Тесты прогноза
+class TestForecast(unittest.TestCase):
+    def setUp(self):
+        # Зарплата и аренда каждый месяц плюс нерегулярные покупки
+        rows = []
+        for month in range(1, 13):
+            rows.append([1000, 'Income', f'2025-{month:02d}-05', 'Зарплата', ''])
+            rows.append([400, 'Expense', f'2025-{month:02d}-01', 'Аренда', ''])
+            rows.append([50 * month, 'Expense', f'2025-{month:02d}-{10 + month:02d}', 'Разное', ''])
+        columns = ["Amount", "Transaction_Type", "Date", "Category", "Comment"]
+        self.forecast = Forecast(pd.DataFrame(rows, columns=columns))
+
+    def test_detect_recurring(self):
+        # Регулярными должны быть только зарплата и аренда
+        recurring = self.forecast.detect_recurring()
+        self.assertEqual(set(recurring['Category']), {'Зарплата', 'Аренда'}, "Регулярные операции не найдены!")
+
+    def test_monte_carlo_bands(self):
+        # Перцентили упорядочены, прогноз воспроизводим при одном seed
+        bands = self.forecast.monte_carlo(24, n_paths=2000, seed=1)
+        self.assertEqual(len(bands), 24)
+        self.assertTrue((bands['P5'] <= bands['P50']).all() and (bands['P50'] <= bands['P95']).all())
+        self.assertTrue(bands.equals(self.forecast.monte_carlo(24, n_paths=2000, seed=1)))
+        with self.assertRaises(ValueError):
+            self.forecast.monte_carlo(MAX_HORIZON_MONTHS + 1)
+
+    def test_monte_carlo_parallel_matches_serial(self):
+        # Пакеты с фиксированными seed дают одинаковый результат при любом числе процессов
+        with mock.patch('forecast.PARALLEL_MIN_PATHS', 0):
+            parallel = self.forecast.monte_carlo(12, n_paths=12000, seed=7, n_jobs=2)
+        serial = self.forecast.monte_carlo(12, n_paths=12000, seed=7, n_jobs=1)
+        self.assertTrue(parallel.equals(serial), "Результат зависит от числа процессов!")
+
+    def test_forecast_sees_new_transactions(self):
+        # Прогноз менеджера транзакций учитывает операции, добавленные после запуска
+        manager = TransactionManager(FinancialController())
+        manager.add_transaction(1000, 'Income', '2026-01-05', 'Зарплата', '')
+        manager.add_transaction(400, 'Expense', '2026-01-10', 'Аренда', '')
+        bands = manager.forecast_balance(3)
+        self.assertTrue((bands['P50'] != 0).all(), "Прогноз не видит новых операций!")
+
+    def test_monte_carlo_converts_currencies(self):
+        # Доход в долларах и расход в рублях прогнозируются в рублях
+        rates = FXRates()
+        rates.set_rates(pd.DataFrame({"Date": ["2025-01-01"], "Currency": ["USD"], "Rate": [100.0]}))
+        rows = []
+        for month in range(1, 13):
+            rows.append([100, 'Income', f'2025-{month:02d}-05', 'Зарплата', '', 'USD'])
+            rows.append([1000, 'Expense', f'2025-{month:02d}-01', 'Аренда', '', 'RUB'])
+        columns = ["Amount", "Transaction_Type", "Date", "Category", "Comment", "Currency"]
+        bands = Forecast(pd.DataFrame(rows, columns=columns), rates).monte_carlo(2, n_paths=100, seed=1)
+        self.assertAlmostEqual(bands['P50'].iloc[0], 12 * 9000 + 9000, delta=100)
+
+# Тесты пересчёта валют
+class TestCurrency(unittest.TestCase):
+    def setUp(self):
+        # Курсы доллара на две даты: до 2026-01-10 — 80, затем — 90
+        self.rates = FXRates()
+        self.rates.set_rates(pd.DataFrame({
+            "Date": ["2026-01-01", "2026-01-10"],
+            "Currency": ["USD", "USD"],
+            "Rate": [80.0, 90.0],
+        }))
+        self.df = pd.DataFrame({
+            "Amount": [100.0, 10.0, 10.0],
+            "Transaction_Type": ["Income", "Expense", "Expense"],
+            "Date": ["2026-01-05", "2026-01-05", "2026-01-12"],
+            "Category": ["Зарплата", "Продукты", "Продукты"],
+            "Comment": ["", "", ""],
+            "Currency": ["RUB", "USD", "USD"],
+        })
+
+    def test_convert_asof(self):
+        # Берётся последний курс, известный на дату операции
+        converted = self.rates.convert(self.df["Amount"], self.df["Currency"], self.df["Date"], "RUB")
+        self.assertEqual(list(converted), [100.0, 800.0, 900.0])
+        with self.assertRaises(ValueError):
+            self.rates.convert([1.0], ["USD"], ["2025-12-31"], "RUB")
+
+    def test_validate_currency(self):
+        # Валюта без курсов или дата до первого курса отклоняются до сохранения
+        valid = validate_transaction('10', 'Expense', '2026-01-05', 'Продукты', '', 'USD', self.rates)
+        unknown = validate_transaction('10', 'Expense', '2026-01-05', 'Продукты', '', 'GBP', self.rates)
+        too_early = validate_transaction('10', 'Expense', '2025-12-31', 'Продукты', '', 'USD', self.rates)
+        base = validate_transaction('10', 'Expense', '2025-12-31', 'Продукты', '', 'RUB', self.rates)
+        self.assertFalse(valid or base, "Корректная валюта вызывает ошибку!")
+        self.assertTrue(unknown and too_early, "Ошибка валюты не выявилась!")
+
+    def test_reporting_currency(self):
+        # Отчёты в валюте отчёта и кэш пересчитанных сумм
+        analytics = Analytics(self.df, self.rates)
+        self.assertEqual(analytics.analyze_categories("RUB")["Продукты"], 1700.0)
+        self.assertEqual(analytics.analyze_period("2026-01-01", "2026-01-31", "USD"), (1.25, 20.0))
+        self.assertIs(analytics.get_amounts("USD"), analytics.get_amounts("usd"))
+        top = analytics.get_top_expenses(1)
+        self.assertEqual((top["Amount"].iloc[0], top["Currency"].iloc[0]), (900.0, "RUB"))
+
+# Тесты производительности: операции контроллера и модели не должны замедляться линейно с ростом журнала
+# Набор долгий, поэтому выполняется только по запросу: PERFORMANCE_TESTS=1,
+# python test_suite.py --performance или run_all_tests(performance=True)
+class TestPerformance(unittest.TestCase):
+    SIZES = (1_000, 100_000)   # Размеры журнала (второй в 100 раз больше)
+    MAX_RATIO = 10             # Допустимое замедление на большом журнале
+    OPERATIONS = 200           # Операций в одном замере
+    REPEATS = 5                # Замеров, из которых берётся лучший
+    enabled = os.environ.get("PERFORMANCE_TESTS") == "1"
+
+    def setUp(self):
+        if not self.enabled:
+            self.skipTest("тесты производительности включаются через PERFORMANCE_TESTS=1")
+
+    def make_controller(self, size):
+        # Контроллер с моделью в памяти: журнал в рублях и долларах, кэш баланса уже построен
+        controller = FinancialController()
+        controller.model.rates.set_rates(pd.DataFrame({"Date": ["2026-01-01"], "Currency": ["USD"], "Rate": [100.0]}))
+        controller.model.set_data(pd.DataFrame({
+            "Amount": np.ones(size),
+            "Transaction_Type": np.where(np.arange(size) % 2, "Income", "Expense"),
+            "Date": "2026-01-01",
+            "Category": "Разное",
+            "Comment": "",
+            "Currency": np.where(np.arange(size) % 3, "RUB", "USD"),
+        }))
+        controller.calculate_balance('RUB')
+        return controller
+
+    def measure(self, size, operation, operations=OPERATIONS):
+        # Лучшее время одной операции на свежем контроллере
+        best = float("inf")
+        for _ in range(self.REPEATS):
+            controller = self.make_controller(size)
+            start = time.perf_counter()
+            for i in range(operations):
+                operation(controller, i)
+            best = min(best, (time.perf_counter() - start) / operations)
+        return best
+
+    def assert_ratio(self, operation, max_ratio, operations=OPERATIONS):
+        small, large = (self.measure(size, operation, operations) for size in self.SIZES)
+        self.assertLess(large, small * max_ratio,
+                        f"Время операции растёт слишком быстро: {small * 1e6:.1f} мкс -> {large * 1e6:.1f} мкс")
+
+    def test_add_then_balance(self):
+        # Добавление через контроллер и пересчёт баланса в валюте отчёта (без перерисовки таблицы в окне)
+        def operation(controller, i):
+            controller.add_transaction(1, 'Income', '2026-01-02', 'Разное', '', 'USD' if i % 2 else 'RUB')
+            controller.calculate_balance('RUB')
+        self.assert_ratio(operation, self.MAX_RATIO)
+
+    def test_delete_then_balance(self):
+        # Удаление и пересчёт баланса в валюте отчёта
+        def operation(controller, i):
+            controller.delete_transaction(i)
+            controller.calculate_balance('RUB')
+        self.assert_ratio(operation, self.MAX_RATIO)
+
+    def test_delete_then_read(self):
+        # Чтение таблицы после удаления копирует её целиком, поэтому рост
+        # допустим не больше линейного (без повторного пересчёта валют и т.п.)
+        def operation(controller, i):
+            controller.delete_transaction(i)
+            controller.model.get_data()
+        self.assert_ratio(operation, 2 * self.SIZES[1] / self.SIZES[0], operations=20)
+
+    def test_large_ledger_balance(self):
+        # Итоги после добавлений и удалений совпадают с полным пересчётом
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                controller = self.make_controller(size)
+                for i in range(self.OPERATIONS):
+                    controller.add_transaction(2, 'Income', '2026-01-01', 'Разное', '', 'USD')
+                    controller.delete_transaction(i)
+                expected = FinancialModel()
+                expected.rates = controller.model.rates
+                expected.set_data(controller.model.get_data())
+                self.assertEqual(len(expected.get_data()), size)
+                self.assertAlmostEqual(controller.calculate_balance('RUB'), expected.calculate_balance('RUB'))
+
+# Наборы тестов
+TEST_CASES = (TestFinancialApp, TestForecast, TestCurrency)
+PERFORMANCE_CASES = (TestPerformance,)
+
+def _run_test(case_name, method_name):
+    """
+    Выполняет один тест (в том числе в отдельном процессе) и возвращает его итог.
+    """
+    result = unittest.TestResult()
+    globals()[case_name](method_name).run(result)
+    if result.errors:
+        return f"{case_name}.{method_name}", "error", result.errors[0][1]
+    if result.failures:
+        return f"{case_name}.{method_name}", "fail", result.failures[0][1]
+    if result.skipped:
+        return f"{case_name}.{method_name}", "skip", result.skipped[0][1]
+    return f"{case_name}.{method_name}", "ok", ""
+
 # Экспорт функции для запуска всех тестов
-def run_all_tests():
+def run_all_tests(callback=None, processes=None, performance=False):
     """
     Запускает все юнит-тесты и возвращает результаты.
+    Тесты выполняются параллельно в processes процессах; итог каждого теста
+    сразу передаётся в callback(имя теста, статус, подробности).
+    С performance=True после них по одному в текущем процессе выполняются
+    тесты производительности, чтобы замеры не конкурировали за процессор.
     """
     test_loader = unittest.TestLoader()
-    test_suite = test_loader.loadTestsFromTestCase(TestFinancialApp)
-    test_runner = unittest.TextTestRunner(verbosity=2)  # Подробный вывод результата
-    result = test_runner.run(test_suite)
-
-    # Возвращаем статистику выполнения тестов
-    total_tests = result.testsRun
-    success_count = total_tests - len(result.failures) - len(result.errors)
-    failure_count = len(result.failures)
-    error_count = len(result.errors)
-    return total_tests, success_count, failure_count, error_count
\ No newline at end of file
+    tests = [(case.__name__, name) for case in TEST_CASES for name in test_loader.getTestCaseNames(case)]
+    performance_tests = [(case.__name__, name) for case in PERFORMANCE_CASES
+                         for name in test_loader.getTestCaseNames(case)] if performance else []
+    processes = min(processes or os.cpu_count() or 1, len(tests))
+
+    if processes > 1:
+        executor = ProcessPoolExecutor(max_workers=processes)
+        futures = [executor.submit(_run_test, *test) for test in tests]
+        results = (future.result() for future in as_completed(futures))
+    else:
+        executor = None
+        results = (_run_test(*test) for test in tests)
+
+    # Возвращаем статистику выполнения тестов (пропущенные считаются успешными)
+    counts = {"ok": 0, "skip": 0, "fail": 0, "error": 0}
+
+    def report(name, status, details):
+        counts[status] += 1
+        if callback is not None:
+            callback(name, status, details)
+
+    try:
+        for result in results:
+            report(*result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    enabled = TestPerformance.enabled
+    TestPerformance.enabled = True
+    try:
+        for test in performance_tests:
+            report(*_run_test(*test))
+    finally:
+        TestPerformance.enabled = enabled
+
+    total_tests = len(tests) + len(performance_tests)
+    return total_tests, counts["ok"] + counts["skip"], counts["fail"], counts["error"]
+
+# Запуск из командной строки: python test_suite.py [--performance]
+if __name__ == "__main__":
+    def print_result(name, status, details):
+        print(f"{name} ... {status}")
+        if details:
+            print(details)
+
+    performance = "--performance" in sys.argv[1:] or TestPerformance.enabled
+    total_tests, success_count, failure_count, error_count = run_all_tests(print_result, performance=performance)
+    print(f"Тестов выполнено: {total_tests}, успешно: {success_count}, провалилось: {failure_count}, ошибок: {error_count}")
+    raise SystemExit(0 if success_count == total_tests else 1)
\ No newline at end of file
@@ -7,6 +7,7 @@ RE_AMOUNT = r"^[+-]?\d+(\.\d+)?$"     # Цифровая сумма (может
 RE_DATE = r"\d{4}-\d{2}-\d{2}"        # Дата в формате YYYY-MM-DD
 RE_CATEGORY = r"^[a-zA-Zа-яА-ЯёЁ\s]+$"# Категория (буквы и пробелы)
 RE_COMMENT = r"^.{0,100}$"            # Комментарий длиной максимум 100 символов
+RE_CURRENCY = r"^[A-Z]{3}$"           # Код валюты ISO 4217 (например, RUB)
 
 # Шаблоны очистки данных
 RE_CLEAN_CATEGORY = r"[^\w\s]"         # Специальные символы в категориях
@@ -33,6 +34,17 @@ def validate_comment(comment):
     """Проверяет длину комментария."""
     return bool(re.match(RE_COMMENT, comment))
 
+def validate_currency(currency, rates=None):
+    """Проверяет код валюты и, если задана таблица курсов, наличие курсов для неё."""
+    if not re.match(RE_CURRENCY, currency):
+        return False
+    return rates is None or currency in rates.currencies()
+
+def validate_rate_date(currency, date_str, rates):
+    """Проверяет, что на дату операции курс валюты уже известен."""
+    first_date = rates.first_date(currency)
+    return first_date is None or datetime.datetime.strptime(date_str, "%Y-%m-%d").date() >= first_date
+
 # Функции очистки данных
 def clean_category(category):
     """Очищает категорию от спецсимволов."""
@@ -45,7 +57,7 @@ def clean_comment(comment):
     return cleaned.strip()
 
 # Главная функция проверки транзакции
-def validate_transaction(amount, type_, date, category, comment):
+def validate_transaction(amount, type_, date, category, comment, currency=None, rates=None):
     errors = []
 
     # Проверка суммы
@@ -68,4 +80,13 @@ def validate_transaction(amount, type_, date, category, comment):
     if not validate_comment(comment):
         errors.append("Комментарий слишком длинный (более 100 символов)")
 
+    # Проверка валюты
+    if currency is not None:
+        if not validate_currency(currency):
+            errors.append("Некорректная валюта, используйте трёхбуквенный код (например, RUB)")
+        elif not validate_currency(currency, rates):
+            errors.append(f"Нет курсов для валюты {currency}")
+        elif rates is not None and validate_date(date) and not validate_rate_date(currency, date, rates):
+            errors.append(f"Нет курса {currency} на эту дату, курсы известны с {rates.first_date(currency)}")
+
     return errors
\ No newline at end of file
@@ -1,10 +1,16 @@
 # view_tkinter.py
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 from datetime import date
 from validation import validate_transaction
 from test_suite import run_all_tests
+from currency import DEFAULT_CURRENCY
+
+# Столбцы таблицы транзакций
+TREE_COLUMNS = ("Amount", "Currency", "Transaction_Type", "Date", "Category", "Comment")
 
 # Главный класс приложения
 class FinancialApp(tk.Tk):
@@ -40,18 +46,53 @@ class FinancialApp(tk.Tk):
         analytics_menu.add_command(label="Доходы/расходы", command=self.plot_income_vs_expenses)
         analytics_menu.add_command(label="Категории", command=self.plot_pie_chart_categories)
         analytics_menu.add_command(label="Крупные траты", command=self.plot_top_expenses)
+        analytics_menu.add_command(label="Прогноз баланса", command=self.plot_forecast)
         menu_bar.add_cascade(label="Аналитика", menu=analytics_menu)
 
         # Меню тестов
         tests_menu = tk.Menu(menu_bar, tearoff=0)
         tests_menu.add_command(label="Запустить тесты", command=self.run_tests)
+        tests_menu.add_command(label="Тесты производительности", command=lambda: self.run_tests(performance=True))
         menu_bar.add_cascade(label="Тесты", menu=tests_menu)
 
-    def run_tests(self):
-        """Запуск тестов и вывод отчёта"""
-        total_tests, success_count, failures, errors = run_all_tests()
-        report = f"Тестов выполнено: {total_tests}\nПрошло успешно: {success_count}\nПровалилось: {failures}\nОшибок: {errors}"
-        messagebox.showinfo("Тесты завершились", report)
+    def run_tests(self, performance=False):
+        """Запуск тестов в фоне с выводом результатов по мере готовности"""
+        window = tk.Toplevel(self)
+        window.title("Тесты")
+        log = tk.Text(window, width=80, height=20)
+        log.pack(fill="both", expand=True)
+
+        # Фоновый поток кладёт результаты в очередь, окно забирает их через after()
+        results = queue.Queue()
+        threading.Thread(target=self.run_tests_worker, args=(results, performance), daemon=True).start()
+        self.after(100, self.poll_test_results, results, window, log)
+
+    def run_tests_worker(self, results, performance):
+        """Выполнение тестов в фоновом потоке"""
+        try:
+            summary = run_all_tests(lambda *result: results.put(("result", result)), performance=performance)
+            results.put(("done", summary))
+        except Exception as error:
+            results.put(("error", error))
+
+    def poll_test_results(self, results, window, log):
+        """Вывод готовых результатов тестов (окно вывода могли уже закрыть)"""
+        while not results.empty():
+            kind, payload = results.get()
+            if kind == "result":
+                name, status, details = payload
+                if window.winfo_exists():
+                    log.insert(tk.END, f"{name} ... {status}\n" + (f"{details}\n" if details else ""))
+                    log.see(tk.END)
+            elif kind == "error":
+                messagebox.showerror("Ошибка", f"Не удалось запустить тесты: {payload}")
+                return
+            else:
+                total_tests, success_count, failures, errors = payload
+                report = f"Тестов выполнено: {total_tests}\nПрошло успешно: {success_count}\nПровалилось: {failures}\nОшибок: {errors}"
+                messagebox.showinfo("Тесты завершились", report)
+                return
+        self.after(100, self.poll_test_results, results, window, log)
 
     def create_transaction_form(self):
         """Форма для добавления транзакций"""
@@ -78,9 +119,14 @@ class FinancialApp(tk.Tk):
         ttk.Label(frame, text="Комментарий:").grid(row=4, column=0, sticky="w")
         self.comment_entry = ttk.Entry(frame); self.comment_entry.grid(row=4, column=1, columnspan=2)
 
+        ttk.Label(frame, text="Валюта:").grid(row=5, column=0, sticky="w")
+        self.currency_var = tk.StringVar(value=DEFAULT_CURRENCY)
+        ttk.Combobox(frame, textvariable=self.currency_var, values=self.logic_manager.get_currencies(),
+                     state="readonly").grid(row=5, column=1, columnspan=2)
+
         # Кнопки
         buttons_frame = ttk.Frame(frame)
-        buttons_frame.grid(row=5, column=0, columnspan=3, pady=10)
+        buttons_frame.grid(row=6, column=0, columnspan=3, pady=10)
         ttk.Button(buttons_frame, text="Добавить", command=self.add_transaction).pack(side="left", padx=10)
         ttk.Button(buttons_frame, text="Удалить", command=self.remove_selected_transaction).pack(side="left", padx=10)
 
@@ -105,9 +151,9 @@ class FinancialApp(tk.Tk):
         list_frame.pack(fill="both", expand="yes", padx=10, pady=10)
 
         # Дерево транзакций
-        self.transactions_tree = ttk.Treeview(list_frame, columns=("Amount", "Type", "Date", "Category", "Comment"))
+        self.transactions_tree = ttk.Treeview(list_frame, columns=TREE_COLUMNS)
         self.transactions_tree.heading("#0", text="№")
-        for col in ("Amount", "Type", "Date", "Category", "Comment"):
+        for col in TREE_COLUMNS:
             self.transactions_tree.heading(col, text=col, command=lambda _col=col: self.sort_column(_col))
             self.transactions_tree.column(col, width=150)
 
@@ -132,8 +178,17 @@ class FinancialApp(tk.Tk):
 
     def create_balance_display(self):
         """Метка текущего баланса"""
-        self.balance_label = ttk.Label(self, text="", font=("Arial", 14))
-        self.balance_label.pack(pady=10)
+        balance_frame = ttk.Frame(self)
+        balance_frame.pack(pady=10)
+        self.balance_label = ttk.Label(balance_frame, text="", font=("Arial", 14))
+        self.balance_label.pack(side="left", padx=10)
+
+        # Валюта отчёта
+        self.report_currency_var = tk.StringVar(value=DEFAULT_CURRENCY)
+        report_currency = ttk.Combobox(balance_frame, textvariable=self.report_currency_var,
+                                       values=self.logic_manager.get_currencies(), state="readonly", width=6)
+        report_currency.pack(side="left")
+        report_currency.bind("<<ComboboxSelected>>", lambda event: self.update_balance_display())
         self.update_balance_display()
 
     def add_transaction(self):
@@ -143,9 +198,11 @@ class FinancialApp(tk.Tk):
         date = self.date_entry.get()
         category = self.category_entry.get()
         comment = self.comment_entry.get()
+        currency = self.currency_var.get()
 
-        # Проверка правильности данных
-        errors = validate_transaction(amount, transaction_type, date, category, comment)
+        # Проверка правильности данных, включая наличие курса валюты на дату
+        errors = validate_transaction(amount, transaction_type, date, category, comment, currency,
+                                      self.logic_manager.get_rates())
         if errors:
             messagebox.showerror("Ошибка", "\n".join(errors))
             return
@@ -154,7 +211,7 @@ class FinancialApp(tk.Tk):
         amount_value = float(amount)
 
         # Добавляем транзакцию
-        self.logic_manager.add_transaction(amount_value, transaction_type, date, category, comment)
+        self.logic_manager.add_transaction(amount_value, transaction_type, date, category, comment, currency)
         self.update_transactions_list()
         self.update_balance_display()
 
@@ -206,13 +263,18 @@ class FinancialApp(tk.Tk):
 
         # Добавляем строки заново
         for idx, row in transactions.iterrows():
-            self.transactions_tree.insert("", "end", text=str(idx + 1), values=tuple(row))
+            self.transactions_tree.insert("", "end", text=str(idx + 1), values=tuple(row.get(col, "") for col in TREE_COLUMNS))
 
     def update_balance_display(self):
         """Обновление отображаемого баланса"""
-        balance = self.logic_manager.calculate_balance()
+        currency = self.report_currency_var.get()
+        try:
+            balance = self.logic_manager.calculate_balance(currency)
+        except ValueError as error:
+            self.balance_label.config(text=f"Баланс: {error}", foreground="red")
+            return
         color = "green" if balance >= 0 else "red"
-        self.balance_label.config(text=f"Баланс: {balance:.2f}", foreground=color)
+        self.balance_label.config(text=f"Баланс: {balance:.2f} {currency}", foreground=color)
 
     def plot_income_vs_expenses(self):
         """Гистограмма доходов и расходов"""
@@ -224,4 +286,8 @@ class FinancialApp(tk.Tk):
 
     def plot_top_expenses(self):
         """Столбчатый график крупных расходов"""
-        self.logic_manager.plot_bar_chart_top_expenses()
\ No newline at end of file
+        self.logic_manager.plot_bar_chart_top_expenses()
+
+    def plot_forecast(self):
+        """Прогноз баланса на год вперёд"""
+        self.logic_manager.plot_forecast()
\ No newline at end of file